@@ -1,16 +1,18 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
 import os, json, datetime as dt
 from typing import Dict, Any, List, Optional, Tuple
 from supabase import create_client, Client
 from groq import Groq
 from datetime import datetime, timedelta, timezone
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from typing import Dict, List
 import os, datetime as dt
 from twilio.rest import Client as TwilioClient
+import threading, time, itertools
+from collections import OrderedDict
 
 load_dotenv()
 
@@ -144,27 +146,302 @@ def _format_vital(value, unit) -> Optional[str]:
         return None
     return f"{value} {unit}".strip() if unit else str(value)
 
+IST = timezone(timedelta(hours=5, minutes=30))
+ROLLUP_PERIODS = ("daily", "weekly")
+
+def _parse_measured_at(value: Any) -> datetime:
+    """
+    Normalise a vitals timestamp to a naive IST datetime.
+    The app writes local timestamps without a zone; aware values are converted to IST.
+    """
+    if isinstance(value, datetime):
+        ts = value
+    elif value:
+        ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    else:
+        ts = datetime.now(IST)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(IST).replace(tzinfo=None)
+    return ts
+
+def _bucket_key(period: str, ts: datetime) -> str:
+    day = ts.date()
+    if period == "weekly":
+        day = day - timedelta(days=day.weekday())
+    return day.isoformat()
+
+def _to_number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _fetch_all(build, page_size: int = 1000) -> List[Dict[str, Any]]:
+    """
+    Page through a query until every matching row has been read.
+    `build` must return a fresh query selected with count="exact"; raises if the
+    server stops returning rows before the reported count is reached.
+    """
+    rows: List[Dict[str, Any]] = []
+    while True:
+        resp = build().range(len(rows), len(rows) + page_size - 1).execute()
+        chunk = resp.data or []
+        rows.extend(chunk)
+        if resp.count is None:
+            raise RuntimeError("Paged query needs count='exact'")
+        if len(rows) >= resp.count:
+            return rows
+        if not chunk:
+            raise RuntimeError(f"Incomplete result: got {len(rows)} of {resp.count} rows")
+
+class VitalsRollupStore:
+    """
+    In-process cache of per-patient vitals rollups, updated incrementally on ingest.
+
+    Each patient has one entry holding its readings by row id, the latest reading per
+    type and daily / weekly buckets trimmed to a fixed window. Ingesting a row id that
+    is already cached replaces that reading, so same-day corrections move the buckets
+    instead of adding to them. Entries are kept in LRU order and evicted beyond
+    `max_patients`. Only readings inside the weekly window are loaded on rebuild, so
+    older readings are not reported as latest.
+    """
+
+    def __init__(
+        self,
+        daily_retention: int = 35,
+        weekly_retention: int = 12,
+        rebuild_seconds: int = 0,
+        max_patients: int = 2000,
+    ):
+        self.retention = {"daily": daily_retention, "weekly": weekly_retention}
+        self.rebuild_seconds = rebuild_seconds
+        self.max_patients = max_patients
+        self._lock = threading.Lock()
+        self._patients: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._refreshing: Dict[str, List[List[Dict[str, Any]]]] = {}
+        self._anon = itertools.count()
+
+    def cutoff(self) -> datetime:
+        """Start of the oldest weekly bucket kept, as a naive IST datetime."""
+        today = datetime.now(IST).date()
+        start = today - timedelta(weeks=self.retention["weekly"] - 1)
+        start -= timedelta(days=start.weekday())
+        return datetime.combine(start, datetime.min.time())
+
+    def is_fresh(self, patient_id: str) -> bool:
+        """
+        True once a patient has been loaded. Ingest keeps entries current after that;
+        a positive `rebuild_seconds` additionally reloads them on a timer.
+        """
+        with self._lock:
+            entry = self._patients.get(patient_id)
+            built = entry["built_at"] if entry else None
+        if built is None:
+            return False
+        return self.rebuild_seconds <= 0 or time.monotonic() - built < self.rebuild_seconds
+
+    def begin_refresh(self, patient_id: str) -> List[Dict[str, Any]]:
+        """
+        Start reloading a patient from the database. Rows ingested until the matching
+        `end_refresh` are collected so the reload cannot drop them.
+        """
+        pending: List[Dict[str, Any]] = []
+        with self._lock:
+            self._refreshing.setdefault(patient_id, []).append(pending)
+        return pending
+
+    def end_refresh(self, patient_id: str, pending: List[Dict[str, Any]], rows: Optional[List[Dict[str, Any]]] = None):
+        """
+        Finish a refresh. With `rows` (the patient's complete history in the window),
+        replace the entry with them and replay the pending rows on top; without,
+        abandon the refresh and leave the entry as it was.
+        """
+        with self._lock:
+            waiting = [p for p in self._refreshing.get(patient_id, []) if p is not pending]
+            if waiting:
+                self._refreshing[patient_id] = waiting
+            else:
+                self._refreshing.pop(patient_id, None)
+            if rows is None:
+                return
+
+            entry = self._new_entry()
+            for row in rows + pending:
+                self._apply(entry, row)
+            entry["built_at"] = time.monotonic()
+            self._put(patient_id, entry)
+
+    def ingest(self, rows: List[Dict[str, Any]]) -> int:
+        """Fold new or updated rows into the rollups. Returns how many were applied."""
+        applied = 0
+        with self._lock:
+            for row in rows:
+                pid = row.get("patient_id")
+                if not pid:
+                    continue
+                entry = self._patients.get(pid)
+                if entry is None:
+                    entry = self._put(pid, self._new_entry())
+                else:
+                    self._patients.move_to_end(pid)
+                if self._apply(entry, row):
+                    applied += 1
+                for pending in self._refreshing.get(pid, ()):
+                    pending.append(row)
+        return applied
+
+    @staticmethod
+    def _new_entry() -> Dict[str, Any]:
+        return {"rows": {}, "latest": {}, "rollups": {}, "built_at": None}
+
+    def _put(self, patient_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        self._patients[patient_id] = entry
+        self._patients.move_to_end(patient_id)
+        while len(self._patients) > self.max_patients:
+            self._patients.popitem(last=False)
+        return entry
+
+    def _apply(self, entry: Dict[str, Any], row: Dict[str, Any]) -> bool:
+        t = (row.get("type") or "").strip().lower()
+        if not t:
+            return False
+        key = row.get("id")
+        if key is None:
+            key = ("anon", next(self._anon))
+        elif key in entry["rows"]:
+            self._remove(entry, key)
+
+        ts = _parse_measured_at(row.get("measured_at"))
+        num = _to_number(row.get("value"))
+        entry["rows"][key] = (t, ts, num, row.get("value"), row.get("unit"))
+
+        cur = entry["latest"].get(t)
+        if cur is None or ts >= entry["rows"][cur][1]:
+            entry["latest"][t] = key
+
+        if num is None:
+            return True
+        for period in ROLLUP_PERIODS:
+            buckets = entry["rollups"].setdefault((t, period), {})
+            bucket = buckets.setdefault(_bucket_key(period, ts), {})
+            bucket[key] = num
+            if len(buckets) > self.retention[period]:
+                dropped = buckets.pop(min(buckets))
+                if period == "weekly":
+                    daily = entry["rollups"].get((t, "daily"), {})
+                    for old in dropped:
+                        rec = entry["rows"].get(old)
+                        if rec is None or entry["latest"].get(t) == old:
+                            continue
+                        if old not in daily.get(_bucket_key("daily", rec[1]), {}):
+                            del entry["rows"][old]
+        return True
+
+    def _remove(self, entry: Dict[str, Any], key: Any):
+        t, ts, num, _, _ = entry["rows"].pop(key)
+        if num is not None:
+            for period in ROLLUP_PERIODS:
+                buckets = entry["rollups"].get((t, period), {})
+                bk = _bucket_key(period, ts)
+                bucket = buckets.get(bk)
+                if bucket and key in bucket:
+                    del bucket[key]
+                    if not bucket:
+                        del buckets[bk]
+        if entry["latest"].get(t) == key:
+            same = [(r[1], k) for k, r in entry["rows"].items() if r[0] == t]
+            if same:
+                entry["latest"][t] = max(same, key=lambda x: x[0])[1]
+            else:
+                del entry["latest"][t]
+
+    def latest(self, patient_id: str) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            entry = self._patients.get(patient_id)
+            if entry is None:
+                return {}
+            self._patients.move_to_end(patient_id)
+            out = {}
+            for t, key in entry["latest"].items():
+                _, ts, _, value, unit = entry["rows"][key]
+                out[t] = {"value": value, "unit": unit, "measured_at": ts.isoformat()}
+            return out
+
+    def rollups(self, patient_id: str, period: str, vital_type: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        with self._lock:
+            entry = self._patients.get(patient_id)
+            if entry is None:
+                return out
+            self._patients.move_to_end(patient_id)
+            types = [vital_type.strip().lower()] if vital_type else sorted({k[0] for k in entry["rollups"]})
+            for t in types:
+                buckets = entry["rollups"].get((t, period))
+                if not buckets:
+                    continue
+                out[t] = [
+                    {
+                        "start": k,
+                        "count": len(b),
+                        "min": min(b.values()),
+                        "max": max(b.values()),
+                        "mean": round(sum(b.values()) / len(b), 2),
+                    }
+                    for k, b in sorted(buckets.items())
+                ]
+        return out
+
+vitals_store = VitalsRollupStore(
+    rebuild_seconds=int(os.getenv("VITALS_CACHE_REBUILD_SECONDS", "0")),
+    max_patients=int(os.getenv("VITALS_CACHE_MAX_PATIENTS", "2000")),
+)
+
+def _chunks(ids: List[str], size: int = 100):
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+def warm_vitals_many(patient_ids: List[str]):
+    """
+    Load patients' rollups from the database when they are not cached yet. After that, POST /vitals keeps them current through ingest.
+    Each chunk of patients is read completely before any of them is marked fresh.
+    """
+    stale = [pid for pid in patient_ids if not vitals_store.is_fresh(pid)]
+    since = vitals_store.cutoff().isoformat()
+    for chunk in _chunks(stale):
+        pending = {pid: vitals_store.begin_refresh(pid) for pid in chunk}
+        try:
+            rows = _fetch_all(lambda: (
+                supabase.table("vitals")
+                .select("id,patient_id,type,value,unit,measured_at", count="exact")
+                .in_("patient_id", chunk)
+                .gte("measured_at", since)
+                .order("measured_at")
+                .order("id")
+            ))
+        except Exception:
+            for pid, p in pending.items():
+                vitals_store.end_refresh(pid, p)
+            raise
+        by_patient: Dict[str, List[Dict[str, Any]]] = {pid: [] for pid in chunk}
+        for row in rows:
+            if row.get("patient_id") in by_patient:
+                by_patient[row["patient_id"]].append(row)
+        for pid, p in pending.items():
+            vitals_store.end_refresh(pid, p, by_patient[pid])
+
+def warm_vitals(patient_id: str):
+    warm_vitals_many([patient_id])
+
 def get_latest_vitals(patient_id: Optional[str]) -> Dict[str, Optional[str]]:
     """
-    Fetch latest per-type vitals from the 'vitals' table (EAV schema).
+    Latest per-type vitals, served from the rollup cache.
     Expected types: 'bp', 'glucose', 'weight'.
     """
     if not patient_id:
         return {"bp": None, "glucose": None, "weight": None}
 
-    resp = (
-        supabase.table("vitals")
-        .select("type,value,unit,measured_at")
-        .eq("patient_id", patient_id)
-        .order("measured_at", desc=True)
-        .limit(200) 
-        .execute()
-    )
-    latest: Dict[str, Dict[str, Any]] = {}
-    for row in resp.data or []:
-        t = (row.get("type") or "").strip().lower()
-        if t and t not in latest:
-            latest[t] = row
+    warm_vitals(patient_id)
+    latest = vitals_store.latest(patient_id)
 
     return {
         "bp": _format_vital(latest.get("bp", {}).get("value"), latest.get("bp", {}).get("unit")),
@@ -345,6 +622,126 @@ def refresh_all(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, g
     }
 
 
+def _caller_id(authorization: Optional[str]) -> str:
+    """Resolve the Supabase user behind an `Authorization: Bearer <access token>` header."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    try:
+        user = supabase.auth.get_user(authorization.split(" ", 1)[1].strip()).user
+    except Exception:
+        user = None
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return user.id
+
+def _authorize_patients(authorization: Optional[str], patient_ids) -> str:
+    """
+    Allow the call only if the caller is each patient themself or the worker assigned
+    to them. Returns the caller's id.
+    """
+    caller = _caller_id(authorization)
+    others = sorted({pid for pid in patient_ids if pid != caller})
+    if others:
+        resp = (
+            supabase.table("profiles")
+            .select("id, assigned_worker_id")
+            .in_("id", others)
+            .execute()
+        )
+        allowed = {r["id"] for r in (resp.data or []) if r.get("assigned_worker_id") == caller}
+        if allowed != set(others):
+            raise HTTPException(status_code=403, detail="Not allowed to access these patients' records")
+    return caller
+
+class VitalIn(BaseModel):
+    patient_id: str = Field(min_length=1)
+    type: str = Field(min_length=1)
+    value: Any
+    unit: Optional[str] = None
+    measured_at: Optional[datetime] = None
+
+class VitalsBatch(BaseModel):
+    vitals: List[VitalIn]
+
+@app.post("/vitals")
+def ingest_vitals(batch: VitalsBatch, authorization: Optional[str] = Header(None)):
+    """
+    Save vitals readings and fold them into the rollup cache.
+    Like the app, keeps one row per patient, type and day: a reading for a day that
+    already has one updates that row in place. Within a batch the last one wins.
+    """
+    _authorize_patients(authorization, [v.patient_id for v in batch.vitals])
+    if not batch.vitals:
+        return {"inserted": 0, "updated": 0, "patients": []}
+
+    by_day: Dict[Tuple[str, str, Any], Dict[str, Any]] = {}
+    for v in batch.vitals:
+        ts = _parse_measured_at(v.measured_at)
+        by_day[(v.patient_id, v.type, ts.date())] = {
+            "patient_id": v.patient_id,
+            "type": v.type,
+            "value": v.value,
+            "unit": v.unit,
+            "measured_at": ts.isoformat(),
+        }
+
+    days = sorted({k[2] for k in by_day})
+    patients = sorted({k[0] for k in by_day})
+    try:
+        existing = _fetch_all(lambda: (
+            supabase.table("vitals")
+            .select("id,patient_id,type,measured_at", count="exact")
+            .in_("patient_id", patients)
+            .in_("type", sorted({k[1] for k in by_day}))
+            .gte("measured_at", datetime.combine(days[0], datetime.min.time()).isoformat())
+            .lte("measured_at", datetime.combine(days[-1], datetime.max.time()).replace(microsecond=0).isoformat())
+            .order("id")
+        ))
+        updates, inserts = [], []
+        for row in existing:
+            key = (row["patient_id"], row["type"], _parse_measured_at(row["measured_at"]).date())
+            if key in by_day and "id" not in by_day[key]:
+                by_day[key]["id"] = row["id"]
+        for row in by_day.values():
+            (updates if "id" in row else inserts).append(row)
+
+        stored: List[Dict[str, Any]] = []
+        if updates:
+            stored += supabase.table("vitals").upsert(updates, on_conflict="id").execute().data or updates
+        if inserts:
+            stored += supabase.table("vitals").insert(inserts).execute().data or inserts
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to store vitals: {e}")
+
+    # Stored rows carry their ids, so updates replace the cached reading.
+    vitals_store.ingest(stored)
+    asha_store.note_vitals(set(patients))
+    return {"inserted": len(inserts), "updated": len(updates), "patients": patients}
+
+@app.get("/vitals/{patient_id}/latest")
+def latest_vitals(patient_id: str, authorization: Optional[str] = Header(None)):
+    _authorize_patients(authorization, [patient_id])
+    warm_vitals(patient_id)
+    return {"patient_id": patient_id, "latest": vitals_store.latest(patient_id)}
+
+@app.get("/vitals/{patient_id}/rollups")
+def vitals_rollups(
+    patient_id: str,
+    period: str = Query("daily", pattern="^(daily|weekly)$"),
+    type: Optional[str] = Query(None),
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Daily or weekly min/max/mean per vital type, oldest bucket first.
+    """
+    _authorize_patients(authorization, [patient_id])
+    warm_vitals(patient_id)
+    return {
+        "patient_id": patient_id,
+        "period": period,
+        "rollups": vitals_store.rollups(patient_id, period, type),
+    }
+
 
 @app.get("/chat/room/{patient_id}")
 def get_chat_room(patient_id: str):
@@ -423,6 +820,8 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
                     "sender": data["sender"],
                     "message": data["text"],
                 }).execute()
+                stored = (resp.data or [{}])[0]
+                asha_store.note_message(patient_id, data["sender"], stored.get("id"), stored.get("created_at"))
 
                 if resp.error:
                     print("Supabase insert error:", resp.error)
@@ -435,6 +834,334 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
         print(f"WebSocket {room_id} disconnected")
 
 
+CLOSED_APPOINTMENT_STATUSES = ("cancelled", "completed")
+
+def _parse_local(value: Any) -> Optional[datetime]:
+    """
+    Parse an app timestamp as an aware IST datetime. Like vitals, appointments are
+    written as IST wall-clock time without a zone; aware values are converted.
+    """
+    if not value:
+        return None
+    ts = value if isinstance(value, datetime) else datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return ts.astimezone(IST) if ts.tzinfo else ts.replace(tzinfo=IST)
+
+def _is_reply(sender: Optional[str]) -> bool:
+    """A helper message marks everything the patient sent before it as read."""
+    return sender == "helper"
+
+class AshaOverviewStore:
+    """
+    Materialized per-worker dashboard rows: profile, latest vitals, open appointments
+    and unread patient messages for every assigned patient.
+
+    A view is built once with paged, batched queries and then kept live by the
+    vitals / appointment / message hooks; events that arrive while a build is reading
+    are buffered and replayed onto it. Only one build per worker runs at a time.
+    Views are rebuilt after `ttl_seconds` to pick up profile changes (sign-up,
+    reassignment), which have no hook. Unread means patient messages since the
+    helper last replied, counted over the last `unread_window_days` on rebuild.
+    """
+
+    def __init__(self, ttl_seconds: int = 900, unread_window_days: int = 30):
+        self.ttl_seconds = ttl_seconds
+        self.unread_window_days = unread_window_days
+        self._lock = threading.Lock()
+        self._views: Dict[str, Dict[str, Any]] = {}
+        self._worker_of: Dict[str, str] = {}
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._building: Dict[str, List[List[Tuple]]] = {}
+
+    def get(self, worker_id: str) -> Dict[str, Any]:
+        view = self._current(worker_id)
+        if view is not None:
+            return view
+        with self._lock:
+            build_lock = self._build_locks.setdefault(worker_id, threading.Lock())
+        with build_lock:
+            view = self._current(worker_id)
+            if view is None:
+                view = self._build(worker_id)
+        return view
+
+    def _current(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            view = self._views.get(worker_id)
+        if view is None or time.monotonic() - view["built_at"] >= self.ttl_seconds:
+            return None
+        return view
+
+    def snapshot(self, worker_id: str, offset: int, limit: int) -> Dict[str, Any]:
+        """Totals plus one page of rows, with appointments rolled forward to now."""
+        view = self.get(worker_id)
+        now = datetime.now(IST)
+        with self._lock:
+            rows = view["rows"]
+            for pid, row in rows.items():
+                appts = view["appts"].get(pid, {})
+                for aid in [aid for aid, (when, _) in appts.items() if when < now]:
+                    del appts[aid]
+                upcoming = sorted(appts.values(), key=lambda a: a[0])
+                row["upcoming_appointments"] = len(upcoming)
+                row["next_appointment"] = dict(upcoming[0][1]) if upcoming else None
+            return {
+                "total": len(rows),
+                "summary": {
+                    "high_risk": sum(1 for r in rows.values() if (r["risk_level"] or "").lower() == "high"),
+                    "with_upcoming_appointments": sum(1 for r in rows.values() if r["upcoming_appointments"]),
+                    "unread_messages": sum(r["unread_messages"] for r in rows.values()),
+                },
+                "patients": [dict(rows[pid]) for pid in view["order"][offset:offset + limit]],
+            }
+
+    def _build(self, worker_id: str) -> Dict[str, Any]:
+        events: List[Tuple] = []
+        with self._lock:
+            self._building.setdefault(worker_id, []).append(events)
+        try:
+            view, seen_messages = self._read(worker_id)
+        finally:
+            with self._lock:
+                waiting = [e for e in self._building.get(worker_id, []) if e is not events]
+                if waiting:
+                    self._building[worker_id] = waiting
+                else:
+                    self._building.pop(worker_id, None)
+
+        with self._lock:
+            for event in events:
+                self._replay(view, event, seen_messages)
+            old = self._views.get(worker_id)
+            if old:
+                for pid in old["rows"]:
+                    if self._worker_of.get(pid) == worker_id:
+                        del self._worker_of[pid]
+            self._views[worker_id] = view
+            for pid in view["rows"]:
+                self._worker_of[pid] = worker_id
+        return view
+
+    def _read(self, worker_id: str) -> Tuple[Dict[str, Any], set]:
+        patients = _fetch_all(lambda: (
+            supabase.table("profiles")
+            .select("id, name, phone, age, gender, village, district, state, conditions, risk_level", count="exact")
+            .eq("assigned_worker_id", worker_id)
+            .eq("role", "patient")
+            .order("id")
+        ))
+        pids = [p["id"] for p in patients]
+
+        rows: Dict[str, Dict[str, Any]] = {}
+        for p in patients:
+            rows[p["id"]] = {
+                "patient_id": p["id"],
+                "name": p.get("name"),
+                "phone": p.get("phone"),
+                "age": p.get("age"),
+                "gender": p.get("gender"),
+                "village": p.get("village"),
+                "district": p.get("district"),
+                "state": p.get("state"),
+                "conditions": p.get("conditions") or [],
+                "risk_level": p.get("risk_level"),
+                "latest_vitals": {},
+                "next_appointment": None,
+                "upcoming_appointments": 0,
+                "unread_messages": 0,
+                "last_message_at": None,
+            }
+        view = {
+            "built_at": time.monotonic(),
+            "rows": rows,
+            "appts": {},
+            "order": sorted(rows, key=lambda pid: ((rows[pid]["name"] or "").lower(), pid)),
+        }
+        if not pids:
+            return view, set()
+
+        warm_vitals_many(pids)
+        for pid in pids:
+            rows[pid]["latest_vitals"] = vitals_store.latest(pid)
+
+        now = datetime.now(IST).replace(tzinfo=None).isoformat()
+        for chunk in _chunks(pids):
+            appts = _fetch_all(lambda: (
+                supabase.table("appointments")
+                .select("id, patient_id, scheduled_time, status", count="exact")
+                .in_("patient_id", chunk)
+                .gte("scheduled_time", now)
+                .or_("status.is.null,status.not.in.(%s)" % ",".join(CLOSED_APPOINTMENT_STATUSES))
+                .order("scheduled_time")
+                .order("id")
+            ))
+            for appt in appts:
+                self._apply_appointment(view, appt)
+
+        return view, self._count_unread(worker_id, rows)
+
+    def _count_unread(self, worker_id: str, rows: Dict[str, Dict[str, Any]], page_size: int = 1000) -> set:
+        """
+        Walk the worker's recent messages newest first, stopping once every room has
+        reached a helper reply or the window runs out. Returns the message ids seen.
+        """
+        since = (datetime.now(timezone.utc) - timedelta(days=self.unread_window_days)).isoformat()
+        open_rooms = set(rows)
+        seen = set()
+        start = 0
+        while open_rooms:
+            chunk = (
+                supabase.table("messages")
+                .select("id, patient_id, sender, created_at")
+                .eq("helper_id", worker_id)
+                .gte("created_at", since)
+                .order("created_at", desc=True)
+                .range(start, start + page_size - 1)
+                .execute()
+            ).data or []
+            if not chunk:
+                break
+            start += len(chunk)
+            for msg in chunk:
+                seen.add(msg.get("id"))
+                pid = msg.get("patient_id")
+                row = rows.get(pid)
+                if row is None:
+                    continue
+                if row["last_message_at"] is None:
+                    row["last_message_at"] = msg.get("created_at")
+                if pid not in open_rooms:
+                    continue
+                if _is_reply(msg.get("sender")):
+                    open_rooms.discard(pid)
+                elif msg.get("sender") == "patient":
+                    row["unread_messages"] += 1
+        return seen
+
+    @staticmethod
+    def _apply_appointment(view: Dict[str, Any], appt: Dict[str, Any]):
+        pid = appt.get("patient_id")
+        if pid not in view["rows"]:
+            return
+        when = _parse_local(appt.get("scheduled_time"))
+        appts = view["appts"].setdefault(pid, {})
+        if when is None or (appt.get("status") or "").lower() in CLOSED_APPOINTMENT_STATUSES:
+            appts.pop(appt.get("id"), None)
+            return
+        appts[appt.get("id")] = (when, {
+            "id": appt.get("id"),
+            "scheduled_time": when.isoformat(),
+            "status": appt.get("status"),
+        })
+
+    @staticmethod
+    def _apply_message(row: Dict[str, Any], sender: Optional[str], at: Optional[str]):
+        row["last_message_at"] = at or datetime.now(timezone.utc).isoformat()
+        if _is_reply(sender):
+            row["unread_messages"] = 0
+        elif sender == "patient":
+            row["unread_messages"] += 1
+
+    def _replay(self, view: Dict[str, Any], event: Tuple, seen_messages: set):
+        kind, pid = event[0], event[1]
+        row = view["rows"].get(pid)
+        if row is None:
+            return
+        if kind == "vitals":
+            row["latest_vitals"] = vitals_store.latest(pid)
+        elif kind == "appointment":
+            self._apply_appointment(view, event[2])
+        elif kind == "message":
+            _, _, sender, message_id, at = event
+            if message_id is None or message_id not in seen_messages:
+                self._apply_message(row, sender, at)
+
+    def _owner_view(self, patient_id: str) -> Optional[Dict[str, Any]]:
+        worker_id = self._worker_of.get(patient_id)
+        return self._views.get(worker_id) if worker_id else None
+
+    def _buffer(self, event: Tuple):
+        # The patient's worker is unknown until a build finishes, so every build sees it.
+        for pending in self._building.values():
+            for events in pending:
+                events.append(event)
+
+    def note_vitals(self, patient_ids):
+        with self._lock:
+            for pid in patient_ids:
+                event = ("vitals", pid)
+                view = self._owner_view(pid)
+                if view is not None:
+                    self._replay(view, event, set())
+                self._buffer(event)
+
+    def note_appointment(self, appt: Dict[str, Any]):
+        with self._lock:
+            event = ("appointment", appt.get("patient_id"), appt)
+            view = self._owner_view(appt.get("patient_id"))
+            if view is not None:
+                self._replay(view, event, set())
+            self._buffer(event)
+
+    def note_message(self, patient_id: str, sender: str, message_id: Any = None, at: Optional[str] = None):
+        with self._lock:
+            event = ("message", patient_id, sender, message_id, at)
+            view = self._owner_view(patient_id)
+            if view is not None:
+                self._replay(view, event, set())
+            self._buffer(event)
+
+asha_store = AshaOverviewStore(
+    ttl_seconds=int(os.getenv("ASHA_OVERVIEW_TTL_SECONDS", "900")),
+    unread_window_days=int(os.getenv("ASHA_UNREAD_WINDOW_DAYS", "30")),
+)
+
+@app.get("/asha/{worker_id}/overview")
+def asha_overview(
+    worker_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    authorization: Optional[str] = Header(None),
+):
+    """
+    One-shot ASHA dashboard: every assigned patient with risk, latest vitals,
+    next appointment and unread message count, paged by name.
+    Only the worker themself (by Supabase access token) may read it.
+    """
+    if _caller_id(authorization) != worker_id:
+        raise HTTPException(status_code=403, detail="Not allowed to view this worker's patients")
+
+    try:
+        snap = asha_store.snapshot(worker_id, offset, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to build overview: {e}")
+
+    return {"worker_id": worker_id, "limit": limit, "offset": offset, **snap}
+
+class AppointmentIn(BaseModel):
+    patient_id: str = Field(min_length=1)
+    worker_id: Optional[str] = None
+    scheduled_time: datetime
+    status: Optional[str] = None
+    notes: Optional[str] = None
+
+@app.post("/appointments")
+def create_appointment(appt: AppointmentIn, authorization: Optional[str] = Header(None)):
+    """
+    Book an appointment and fold it into the worker's overview. Only the patient or
+    their assigned worker may book. Times are stored as IST wall-clock, like the app.
+    """
+    _authorize_patients(authorization, [appt.patient_id])
+    payload = appt.model_dump(exclude_none=True)
+    payload["scheduled_time"] = _parse_local(appt.scheduled_time).replace(tzinfo=None).isoformat()
+    try:
+        resp = supabase.table("appointments").insert(payload).execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create appointment: {e}")
+
+    row = (resp.data or [payload])[0]
+    asha_store.note_appointment(row)
+    return row
+
 class SendReport(BaseModel):
     sent: int
     skipped: int
@@ -0,0 +1,133 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+class FakeQuery:
+    """Just enough of the PostgREST query builder for the cache code paths."""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.filters = []
+        self.orders = []
+        self.bounds = None
+        self.count = False
+        self.to_insert = None
+        self.to_upsert = None
+
+    def select(self, cols, count=None):
+        self.count = count == "exact"
+        return self
+
+    def eq(self, col, val):
+        self.filters.append(lambda r: r.get(col) == val)
+        return self
+
+    def in_(self, col, vals):
+        vals = set(vals)
+        self.filters.append(lambda r: r.get(col) in vals)
+        return self
+
+    def gte(self, col, val):
+        self.filters.append(lambda r: r.get(col) is not None and str(r[col]) >= str(val))
+        return self
+
+    def lte(self, col, val):
+        self.filters.append(lambda r: r.get(col) is not None and str(r[col]) <= str(val))
+        return self
+
+    def lt(self, col, val):
+        self.filters.append(lambda r: r.get(col) is not None and str(r[col]) < str(val))
+        return self
+
+    def or_(self, expr):
+        self.client.or_filters.append(expr)
+        return self
+
+    def order(self, col, desc=False):
+        self.orders.append((col, desc))
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end + 1)
+        return self
+
+    def limit(self, n):
+        self.bounds = (0, n)
+        return self
+
+    def insert(self, rows):
+        self.to_insert = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict="id"):
+        self.to_upsert = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def execute(self):
+        data = self.client.tables.setdefault(self.table, [])
+        if self.to_upsert is not None:
+            by_id = {r.get("id"): r for r in data}
+            for row in self.to_upsert:
+                if row.get("id") in by_id:
+                    by_id[row["id"]].update(row)
+                else:
+                    data.append(dict(row))
+            return SimpleNamespace(data=[dict(r) for r in self.to_upsert], count=None)
+        if self.to_insert is not None:
+            stored = []
+            for row in self.to_insert:
+                self.client.next_id += 1
+                stored.append({"id": self.client.next_id, **row})
+            data.extend(stored)
+            return SimpleNamespace(data=[dict(r) for r in stored], count=None)
+
+        rows = [r for r in data if all(f(r) for f in self.filters)]
+        for col, desc in reversed(self.orders):
+            rows.sort(key=lambda r: str(r.get(col)), reverse=desc)
+        total = len(rows)
+        if self.bounds:
+            rows = rows[self.bounds[0]:self.bounds[1]]
+        rows = rows[:self.client.max_rows]
+        return SimpleNamespace(data=[dict(r) for r in rows], count=total if self.count else None)
+
+
+class FakeAuth:
+    def __init__(self):
+        self.tokens = {}
+
+    def get_user(self, token):
+        if token not in self.tokens:
+            raise ValueError("invalid JWT")
+        return SimpleNamespace(user=SimpleNamespace(id=self.tokens[token]))
+
+
+class FakeSupabase:
+    def __init__(self, max_rows=1000):
+        self.auth = FakeAuth()
+        self.tables = {}
+        self.max_rows = max_rows
+        self.next_id = 1000
+        self.or_filters = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    client = FakeSupabase()
+    monkeypatch.setattr(main, "supabase", client)
+    monkeypatch.setattr(main, "vitals_store", main.VitalsRollupStore())
+    monkeypatch.setattr(main, "asha_store", main.AshaOverviewStore())
+    return client
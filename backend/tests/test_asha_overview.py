@@ -0,0 +1,223 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+def patient(pid, worker, name=None, **extra):
+    return {"id": pid, "name": name or pid, "role": "patient", "assigned_worker_id": worker, **extra}
+
+
+def ist_in_hours(h):
+    """Naive IST wall-clock time, the way the app writes appointments."""
+    return (datetime.now(main.IST) + timedelta(hours=h)).replace(tzinfo=None, microsecond=0).isoformat()
+
+
+def minutes_ago(m):
+    return (datetime.now(timezone.utc) - timedelta(minutes=m)).isoformat()
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def store(db, monkeypatch):
+    s = main.AshaOverviewStore(ttl_seconds=0)
+    monkeypatch.setattr(main, "asha_store", s)
+    return s
+
+
+def page(store, worker_id):
+    return {r["patient_id"]: r for r in store.snapshot(worker_id, 0, 500)["patients"]}
+
+
+def test_closed_appointments_are_not_upcoming(db, store):
+    db.tables["profiles"] = [patient("p1", "w1")]
+    db.tables["appointments"] = [
+        {"id": 1, "patient_id": "p1", "scheduled_time": ist_in_hours(1), "status": "cancelled"},
+        {"id": 2, "patient_id": "p1", "scheduled_time": ist_in_hours(2), "status": "completed"},
+        {"id": 3, "patient_id": "p1", "scheduled_time": ist_in_hours(3), "status": "scheduled"},
+    ]
+    row = page(store, "w1")["p1"]
+    assert row["upcoming_appointments"] == 1
+    assert row["next_appointment"]["id"] == 3
+    assert db.or_filters == ["status.is.null,status.not.in.(cancelled,completed)"]
+
+    store.ttl_seconds = 900
+    store.note_appointment({"id": 4, "patient_id": "p1", "scheduled_time": ist_in_hours(0.5), "status": "cancelled"})
+    assert page(store, "w1")["p1"]["next_appointment"]["id"] == 3
+    store.note_appointment({"id": 5, "patient_id": "p1", "scheduled_time": ist_in_hours(0.5), "status": "scheduled"})
+    row = page(store, "w1")["p1"]
+    assert row["next_appointment"]["id"] == 5
+    assert row["upcoming_appointments"] == 2
+    store.note_appointment({"id": 5, "patient_id": "p1", "scheduled_time": ist_in_hours(0.5), "status": "cancelled"})
+    assert page(store, "w1")["p1"]["next_appointment"]["id"] == 3
+
+
+def test_naive_appointment_times_are_ist(db, store):
+    db.tables["profiles"] = [patient("p1", "w1")]
+    store.ttl_seconds = 900
+    store.get("w1")
+    store.note_appointment({"id": 1, "patient_id": "p1", "scheduled_time": ist_in_hours(-1), "status": "scheduled"})
+    store.note_appointment({"id": 2, "patient_id": "p1", "scheduled_time": ist_in_hours(2), "status": "scheduled"})
+
+    row = page(store, "w1")["p1"]
+    assert row["upcoming_appointments"] == 1
+    assert row["next_appointment"]["scheduled_time"].endswith("+05:30")
+
+
+def test_reassigned_patient_stays_with_new_worker(db, store):
+    db.tables["profiles"] = [patient("p1", "wA")]
+    store.get("wA")
+    db.tables["profiles"] = [patient("p1", "wB")]
+    store.get("wB")
+    store.get("wA")
+
+    store.note_message("p1", "patient")
+    assert store._views["wB"]["rows"]["p1"]["unread_messages"] == 1
+    assert "p1" not in store._views["wA"]["rows"]
+
+
+def test_unread_pages_through_recent_history_and_matches_live_hook(db, store):
+    db.max_rows = 2
+    db.tables["profiles"] = [patient("p1", "w1"), patient("p2", "w1"), patient("p3", "w1")]
+    db.tables["messages"] = [
+        {"id": 1, "helper_id": "w1", "patient_id": "p1", "sender": "patient", "created_at": minutes_ago(1)},
+        {"id": 2, "helper_id": "w1", "patient_id": "p1", "sender": "system", "created_at": minutes_ago(2)},
+        {"id": 3, "helper_id": "w1", "patient_id": "p1", "sender": "patient", "created_at": minutes_ago(3)},
+        {"id": 4, "helper_id": "w1", "patient_id": "p1", "sender": "helper", "created_at": minutes_ago(4)},
+        {"id": 5, "helper_id": "w1", "patient_id": "p1", "sender": "patient", "created_at": minutes_ago(5)},
+        {"id": 6, "helper_id": "w1", "patient_id": "p2", "sender": "patient", "created_at": minutes_ago(60)},
+        {"id": 7, "helper_id": "w1", "patient_id": "p3", "sender": "patient", "created_at": minutes_ago(60 * 24 * 40)},
+    ]
+    rows = store.get("w1")["rows"]
+    assert rows["p1"]["unread_messages"] == 2
+    assert rows["p2"]["unread_messages"] == 1
+    assert rows["p2"]["last_message_at"] == db.tables["messages"][5]["created_at"]
+    assert rows["p3"]["unread_messages"] == 0
+
+    store.note_message("p1", "system")
+    assert rows["p1"]["unread_messages"] == 2
+    store.note_message("p1", "helper")
+    assert rows["p1"]["unread_messages"] == 0
+
+
+def test_view_stays_live_without_rebuilding(db, store):
+    store.ttl_seconds = 900
+    db.tables["profiles"] = [patient("p1", "w1")]
+    day = main.vitals_store.cutoff().replace(hour=9) + timedelta(days=1)
+    db.tables["vitals"] = [{"id": 1, "patient_id": "p1", "type": "Weight", "value": 60, "measured_at": day.isoformat()}]
+    view = store.get("w1")
+    assert view["rows"]["p1"]["latest_vitals"]["weight"]["value"] == 60
+
+    db.tables["profiles"].append(patient("p2", "w1"))
+    main.vitals_store.ingest([{"id": 1, "patient_id": "p1", "type": "Weight", "value": 61, "measured_at": day.isoformat()}])
+    store.note_vitals({"p1"})
+
+    assert store.get("w1") is view
+    assert page(store, "w1")["p1"]["latest_vitals"]["weight"]["value"] == 61
+
+
+def test_events_during_a_build_are_replayed(db, store, monkeypatch):
+    db.tables["profiles"] = [patient("p1", "w1")]
+    db.tables["messages"] = [{"id": 1, "helper_id": "w1", "patient_id": "p1", "sender": "patient", "created_at": minutes_ago(1)}]
+    count_unread = main.AshaOverviewStore._count_unread
+
+    def racing_count(self, worker_id, rows, page_size=1000):
+        seen = count_unread(self, worker_id, rows, page_size)
+        self.note_message("p1", "patient", 1)
+        self.note_message("p1", "patient", 2)
+        self.note_appointment({"id": 9, "patient_id": "p1", "scheduled_time": ist_in_hours(1), "status": "scheduled"})
+        main.vitals_store.ingest([{"id": 5, "patient_id": "p1", "type": "Weight", "value": 70, "measured_at": ist_in_hours(0)}])
+        self.note_vitals({"p1"})
+        return seen
+
+    monkeypatch.setattr(main.AshaOverviewStore, "_count_unread", racing_count)
+    store.ttl_seconds = 900
+    row = page(store, "w1")["p1"]
+    assert row["unread_messages"] == 2
+    assert row["next_appointment"]["id"] == 9
+    assert row["latest_vitals"]["weight"]["value"] == 70
+    assert not store._building
+
+
+def test_concurrent_requests_share_one_build(db, store, monkeypatch):
+    store.ttl_seconds = 900
+    db.tables["profiles"] = [patient("p1", "w1")]
+    read = main.AshaOverviewStore._read
+    calls = []
+
+    def slow_read(self, worker_id):
+        calls.append(worker_id)
+        time.sleep(0.05)
+        return read(self, worker_id)
+
+    monkeypatch.setattr(main.AshaOverviewStore, "_read", slow_read)
+    views = []
+    threads = [threading.Thread(target=lambda: views.append(store.get("w1"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["w1"]
+    assert all(v is views[0] for v in views)
+
+
+def test_profiles_are_paged(db, store):
+    db.max_rows = 2
+    db.tables["profiles"] = [patient(f"p{i}", "w1") for i in range(5)]
+    assert store.snapshot("w1", 0, 50)["total"] == 5
+
+
+def test_warm_vitals_many_loads_every_patient_past_row_cap(db):
+    db.max_rows = 3
+    day = main.vitals_store.cutoff().replace(hour=9) + timedelta(days=1)
+    pids = [f"p{i}" for i in range(150)]
+    db.tables["vitals"] = [
+        {"id": n, "patient_id": pid, "type": "Weight", "value": 50 + k, "measured_at": (day + timedelta(hours=k)).isoformat()}
+        for n, (pid, k) in enumerate((pid, k) for pid in pids for k in range(4))
+    ]
+    main.warm_vitals_many(pids)
+
+    for pid in pids:
+        assert main.vitals_store.latest(pid)["weight"]["value"] == 53
+        assert main.vitals_store.is_fresh(pid)
+
+
+def test_overview_requires_the_workers_own_token(db, store):
+    db.tables["profiles"] = [patient("p1", "w1", phone="9876543210")]
+    db.auth.tokens = {"tok-w1": "w1", "tok-w2": "w2"}
+    client = TestClient(main.app)
+
+    assert client.get("/asha/w1/overview").status_code == 401
+    assert client.get("/asha/w1/overview", headers=auth("nope")).status_code == 401
+    assert client.get("/asha/w1/overview", headers=auth("tok-w2")).status_code == 403
+
+    resp = client.get("/asha/w1/overview", headers=auth("tok-w1"))
+    assert resp.status_code == 200
+    assert resp.json()["total"] == 1
+
+
+def test_booking_requires_patient_or_worker_and_updates_overview(db, store):
+    store.ttl_seconds = 900
+    db.tables["profiles"] = [patient("p1", "w1")]
+    db.auth.tokens = {"tok-p1": "p1", "tok-w1": "w1", "tok-w2": "w2"}
+    client = TestClient(main.app)
+    store.get("w1")
+
+    body = {"patient_id": "p1", "worker_id": "w1", "scheduled_time": ist_in_hours(2), "status": "scheduled"}
+    assert client.post("/appointments", json=body).status_code == 401
+    assert client.post("/appointments", headers=auth("tok-w2"), json=body).status_code == 403
+    resp = client.post("/appointments", headers=auth("tok-p1"), json=body)
+    assert resp.status_code == 200
+    assert db.tables["appointments"][0]["scheduled_time"] == body["scheduled_time"]
+
+    overview = client.get("/asha/w1/overview", headers=auth("tok-w1")).json()
+    assert overview["patients"][0]["next_appointment"]["id"] == resp.json()["id"]
+    assert overview["summary"]["with_upcoming_appointments"] == 1
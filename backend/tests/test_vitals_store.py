@@ -0,0 +1,176 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+def reading(pid, value, measured_at, type="Weight", **extra):
+    return {"patient_id": pid, "type": type, "value": value, "unit": "kg", "measured_at": measured_at, **extra}
+
+
+def test_out_of_order_ingest_keeps_newest_as_latest():
+    store = main.VitalsRollupStore()
+    store.ingest([reading("p1", 72, "2026-10-19T08:00:00")])
+    store.ingest([reading("p1", 68, "2026-10-19T07:00:00")])
+
+    assert store.latest("p1")["weight"]["value"] == 72
+    day = store.rollups("p1", "daily")["weight"]
+    assert day == [{"start": "2026-10-19", "count": 2, "min": 68.0, "max": 72.0, "mean": 70.0}]
+
+
+def test_retention_evicts_oldest_bucket_and_ignores_older_readings():
+    store = main.VitalsRollupStore(daily_retention=3)
+    for day in (15, 16, 17, 18):
+        store.ingest([reading("p1", day, f"2026-10-{day}T09:00:00")])
+
+    starts = [b["start"] for b in store.rollups("p1", "daily")["weight"]]
+    assert starts == ["2026-10-16", "2026-10-17", "2026-10-18"]
+
+    store.ingest([reading("p1", 1, "2026-10-01T09:00:00")])
+    starts = [b["start"] for b in store.rollups("p1", "daily")["weight"]]
+    assert starts == ["2026-10-16", "2026-10-17", "2026-10-18"]
+
+
+def test_lru_bound_evicts_least_recently_used_patient():
+    store = main.VitalsRollupStore(max_patients=2)
+    store.ingest([reading("p1", 60, "2026-10-19T08:00:00")])
+    store.ingest([reading("p2", 61, "2026-10-19T08:00:00")])
+    store.latest("p1")
+    store.ingest([reading("p3", 62, "2026-10-19T08:00:00")])
+
+    assert store.latest("p2") == {}
+    assert store.latest("p1") and store.latest("p3")
+
+
+def test_refresh_keeps_rows_ingested_while_reading():
+    store = main.VitalsRollupStore()
+    pending = store.begin_refresh("p1")
+    store.ingest([reading("p1", 75, "2026-10-19T09:00:00", id=9)])
+    store.end_refresh("p1", pending, [reading("p1", 70, "2026-10-18T09:00:00", id=8)])
+
+    assert store.latest("p1")["weight"]["value"] == 75
+    assert store.is_fresh("p1")
+
+
+def test_refresh_does_not_double_count_rows_it_already_read():
+    store = main.VitalsRollupStore()
+    pending = store.begin_refresh("p1")
+    row = reading("p1", 75, "2026-10-19T09:00:00", id=9)
+    store.ingest([row])
+    store.end_refresh("p1", pending, [row])
+
+    assert store.rollups("p1", "daily")["weight"][0]["count"] == 1
+
+
+def test_abandoned_refresh_does_not_mark_fresh():
+    store = main.VitalsRollupStore()
+    store.ingest([reading("p1", 75, "2026-10-19T09:00:00")])
+    pending = store.begin_refresh("p1")
+    store.end_refresh("p1", pending)
+
+    assert not store.is_fresh("p1")
+    assert store.latest("p1")["weight"]["value"] == 75
+
+
+def test_warm_vitals_pages_past_the_server_row_cap(db):
+    db.max_rows = 2
+    since = main.vitals_store.cutoff()
+    db.tables["vitals"] = [
+        reading("p1", 60 + i, (since.replace(hour=9) + main.timedelta(days=i)).isoformat(), id=i)
+        for i in range(5)
+    ]
+    main.warm_vitals("p1")
+
+    weekly = main.vitals_store.rollups("p1", "weekly")["weight"]
+    assert sum(b["count"] for b in weekly) == 5
+    assert main.vitals_store.is_fresh("p1")
+
+
+def test_fetch_all_raises_on_truncated_result():
+    class Query:
+        def range(self, start, end):
+            return self
+
+        def execute(self):
+            return SimpleNamespace(data=[], count=5)
+
+    with pytest.raises(RuntimeError):
+        main._fetch_all(Query)
+
+
+def test_ingesting_a_known_row_id_replaces_the_reading():
+    store = main.VitalsRollupStore()
+    store.ingest([reading("p1", 60, "2026-10-20T00:00:00", id=1)])
+    store.ingest([reading("p1", 70, "2026-10-21T00:00:00", id=2)])
+    store.ingest([reading("p1", 72, "2026-10-21T00:00:00", id=2)])
+
+    assert store.latest("p1")["weight"]["value"] == 72
+    daily = store.rollups("p1", "daily")["weight"]
+    assert [(b["start"], b["count"], b["mean"]) for b in daily] == [("2026-10-20", 1, 60.0), ("2026-10-21", 1, 72.0)]
+    assert store.rollups("p1", "weekly")["weight"] == [
+        {"start": "2026-10-19", "count": 2, "min": 60.0, "max": 72.0, "mean": 66.0}
+    ]
+
+    store.ingest([reading("p1", 59, "2026-10-19T00:00:00", id=2)])
+    assert store.latest("p1")["weight"]["value"] == 60
+    assert [b["start"] for b in store.rollups("p1", "daily")["weight"]] == ["2026-10-19", "2026-10-20"]
+
+
+@pytest.fixture
+def client(db):
+    db.auth.tokens = {"tok-p1": "p1", "tok-w1": "w1", "tok-w2": "w2"}
+    db.tables["profiles"] = [{"id": "p1", "assigned_worker_id": "w1"}]
+    return TestClient(main.app)
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_post_vitals_rejects_empty_fields(db, client):
+    resp = client.post("/vitals", headers=auth("tok-p1"), json={"vitals": [{"patient_id": "", "type": "Weight", "value": 60}]})
+    assert resp.status_code == 422
+    resp = client.post("/vitals", headers=auth("tok-p1"), json={"vitals": [{"patient_id": "p1", "type": "", "value": 60}]})
+    assert resp.status_code == 422
+    assert not db.tables.get("vitals")
+
+
+def test_post_vitals_keeps_one_row_per_type_and_day(db, client):
+    body = {"vitals": [
+        {"patient_id": "p1", "type": "Weight", "value": 60, "unit": "kg", "measured_at": "2026-10-19 00:00:00"},
+        {"patient_id": "p1", "type": "Mood", "value": "good", "measured_at": "2026-10-19 00:00:00"},
+    ]}
+    resp = client.post("/vitals", headers=auth("tok-p1"), json=body)
+    assert resp.json() == {"inserted": 2, "updated": 0, "patients": ["p1"]}
+
+    body["vitals"][0]["value"] = 61
+    resp = client.post("/vitals", headers=auth("tok-p1"), json=body)
+    assert resp.json() == {"inserted": 0, "updated": 2, "patients": ["p1"]}
+
+    assert sorted(r["value"] for r in db.tables["vitals"] if r["type"] == "Weight") == [61]
+    assert main.vitals_store.rollups("p1", "daily")["weight"][0]["count"] == 1
+    assert main.vitals_store.latest("p1")["weight"]["value"] == 61
+    assert main.vitals_store.latest("p1")["mood"]["value"] == "good"
+
+
+def test_vitals_endpoints_allow_only_patient_or_assigned_worker(client):
+    reading = {"vitals": [{"patient_id": "p1", "type": "Weight", "value": 60}]}
+    assert client.post("/vitals", json=reading).status_code == 401
+    assert client.post("/vitals", headers=auth("tok-w2"), json=reading).status_code == 403
+    assert client.post("/vitals", headers=auth("tok-w1"), json=reading).status_code == 200
+
+    assert client.get("/vitals/p1/latest").status_code == 401
+    assert client.get("/vitals/p1/latest", headers=auth("tok-w2")).status_code == 403
+    assert client.get("/vitals/p1/rollups", headers=auth("tok-w2")).status_code == 403
+    resp = client.get("/vitals/p1/latest", headers=auth("tok-p1"))
+    assert resp.json()["latest"]["weight"]["value"] == 60
+
+
+def test_feed_vitals_come_from_the_cache(db):
+    pending = main.vitals_store.begin_refresh("p1")
+    main.vitals_store.end_refresh("p1", pending, [reading("p1", 60, "2026-10-18T00:00:00", id=1, type="weight")])
+    db.tables["vitals"] = []
+
+    assert main.get_latest_vitals("p1")["weight"] == "60 kg"
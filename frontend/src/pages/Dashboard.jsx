@@ -29,6 +29,23 @@ import {
 import TopNavbar from '../components/TopNavbar';
 import BottomNavbar from '../components/BottomNavbar';
 
+const API_BASE = 'http://localhost:8003'; // FastAPI server
+
+// POST JSON to the API as the signed-in user.
+const postApi = async (path, body) => {
+	const { data } = await supabase.auth.getSession();
+	const res = await fetch(`${API_BASE}${path}`, {
+		method: 'POST',
+		headers: {
+			'Content-Type': 'application/json',
+			Authorization: `Bearer ${data?.session?.access_token || ''}`,
+		},
+		body: JSON.stringify(body),
+	});
+	if (!res.ok) throw new Error(`Request failed (${res.status})`);
+	return res.json();
+};
+
 /* ---------------------- Date helpers (no TZ) ---------------------- */
 const ymd = (d) => {
 	const dt = d instanceof Date ? d : new Date(d);
@@ -152,7 +169,6 @@ export default function PatientDashboard() {
 		if (!userId) return;
 		try {
 			const measured_at = tsNoTZ(todayKey, '00:00:00');
-			const created_at = tsNoTZ(todayKey, '00:00:00');
 
 			const candidates = [
 				{ type: 'Blood Glucose', unit: 'mg/dL', val: Number(newVals.glucose) },
@@ -170,43 +186,18 @@ export default function PatientDashboard() {
 				{ type: 'Heart Rate', unit: 'bpm', val: Number(newVals.hr) },
 			];
 
-			const dayStart = tsNoTZ(todayKey, '00:00:00');
-			const dayEnd = tsNoTZ(todayKey, '23:59:59');
-
-			for (const c of candidates) {
-				if (Number.isNaN(c.val)) continue;
-
-				const { data: existing, error: selErr } = await supabase
-					.from('vitals')
-					.select('id')
-					.eq('patient_id', userId)
-					.eq('type', c.type)
-					.gte('measured_at', dayStart)
-					.lte('measured_at', dayEnd)
-					.limit(1);
-				if (selErr) throw selErr;
-
-				if (existing && existing.length) {
-					const id = existing[0].id;
-					const { error: upErr } = await supabase
-						.from('vitals')
-						.update({ value: c.val, unit: c.unit, measured_at })
-						.eq('id', id);
-					if (upErr) throw upErr;
-				} else {
-					const { error: inErr } = await supabase.from('vitals').insert([
-						{
-							patient_id: userId,
-							type: c.type,
-							value: c.val,
-							unit: c.unit,
-							measured_at,
-							created_at,
-						},
-					]);
-					if (inErr) throw inErr;
-				}
-			}
+			// The API keeps one row per type per day, updating today's row if it exists.
+			const readings = candidates
+				.filter((c) => !Number.isNaN(c.val))
+				.map((c) => ({
+					patient_id: userId,
+					type: c.type,
+					value: c.val,
+					unit: c.unit,
+					measured_at,
+				}));
+
+			if (readings.length) await postApi('/vitals', { vitals: readings });
 
 			await fetchAllVitals();
 			setIsVitalsModalOpen(false);
@@ -358,14 +349,12 @@ export default function PatientDashboard() {
 								if (!userId || !assignedWorker?.id) return;
 								const dateKey = ymd(date);
 								const scheduled_time = tsNoTZ(dateKey, time + ':00'); // 'HH:MM:SS'
-								const { error } = await supabase.from('appointments').insert({
+								await postApi('/appointments', {
 									patient_id: userId,
 									worker_id: assignedWorker.id,
 									scheduled_time,
 									status: 'scheduled',
-									notes: null,
 								});
-								if (error) throw error;
 								setApptOpen(false);
 								alert('Appointment booked!');
 							} catch (e) {